@@ -1,4 +1,29 @@
-__all__ = ["Settings", "AsyncHTTP", "api_health"]
-from .config import Settings
-from .http import AsyncHTTP
-from .health import api_health
+from typing import TYPE_CHECKING
+
+__all__ = ["Settings", "AsyncHTTP", "api_health", "read", "iter_read"]
+
+if TYPE_CHECKING:
+    from .health import api_health
+    from .http import AsyncHTTP
+    from .reader import iter_read, read
+    from .settings import Settings
+
+# Resolved on first access (PEP 562) so `import elexon_dl` and CLI startup stay cheap.
+_LAZY = {
+    "Settings": "settings",
+    "AsyncHTTP": "http",
+    "api_health": "health",
+    "read": "reader",
+    "iter_read": "reader",
+}
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        value = getattr(import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import hashlib
+import io
+import json
+import os
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Layout (safe to share between hosts/processes, no locks):
+#   objects/<sha[:2]>/<sha256>      response bodies, content-addressed (stored once)
+#   refs/<key[:2]>/<key>.json       request key -> {"sha256", "size", "ts", ...}
+# Every file is published by writing a temp file in the same directory and
+# os.replace()-ing it into place; bodies are verified against their sha256 on read.
+# Entries of the old flat layout (<key>.bin + <key>.meta.json in the root) are moved
+# into this one when read, or all at once by sweep().
+
+_OBJ_RE = re.compile(r"^objects/[0-9a-f]{2}/([0-9a-f]{64})$")
+_REF_RE = re.compile(r"^refs/[0-9a-f]{2}/([0-9a-f]{40})\.json$")
+_SHA_RE = re.compile(r"^[0-9a-f]{64}$")
+_LEGACY_RE = re.compile(r"^([0-9a-f]{40})\.bin$")
+STALE_TMP_S = 3600  # temp files older than this were left by killed writers
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.parent / f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+class DiskCache:
+    def __init__(self, root: Path, ttl_s: Optional[int] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+
+    def _obj(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / sha
+
+    def _ref(self, key: str) -> Path:
+        return self.root / "refs" / key[:2] / f"{key}.json"
+
+    def _read_ref(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._ref(key).read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Body and metadata for key, or None if absent, expired or failing its checksum."""
+        ref = self._read_ref(key)
+        if ref is None and self._migrate(key):
+            ref = self._read_ref(key)
+        if not ref or not _SHA_RE.match(str(ref.get("sha256", ""))):
+            return None
+        if self.ttl_s is not None and (time.time() - float(ref.get("ts", 0))) > self.ttl_s:
+            return None
+        obj = self._obj(ref["sha256"])
+        try:
+            data = obj.read_bytes()
+        except OSError:
+            return None
+        if len(data) != ref.get("size", len(data)) or hashlib.sha256(data).hexdigest() != ref["sha256"]:
+            # only a miss: on shared filesystems this may be a transient short/stale read of a
+            # good object other refs and hosts rely on; put_object repairs genuinely bad ones
+            return None
+        return data, ref
+
+    def put_object(self, data: bytes) -> str:
+        """Publish a body under its sha256, replacing an existing copy only if it fails verification."""
+        sha = hashlib.sha256(data).hexdigest()
+        obj = self._obj(sha)
+        try:
+            current = obj.read_bytes()
+        except OSError:
+            current = None
+        if current is None or len(current) != len(data) or hashlib.sha256(current).hexdigest() != sha:
+            _atomic_write(obj, data)
+        return sha
+
+    def put(self, key: str, data: bytes, meta: Dict[str, Any]) -> None:
+        """Publish body then ref, so a visible ref always points at a complete object."""
+        sha = self.put_object(data)
+        ref = dict(meta, sha256=sha, size=len(data), ts=meta.get("ts", time.time()))
+        _atomic_write(self._ref(key), json.dumps(ref, ensure_ascii=False).encode("utf-8"))
+
+    def _migrate(self, key: str) -> bool:
+        """Move an old flat-layout entry for key into refs/objects; False if there is none.
+
+        An existing ref for key is newer and wins; the old files are removed either way.
+        """
+        body, meta = self.root / f"{key}.bin", self.root / f"{key}.meta.json"
+        try:
+            data = body.read_bytes()
+        except OSError:
+            return False
+        if self._read_ref(key) is None:
+            try:
+                info = json.loads(meta.read_bytes())
+            except (OSError, ValueError):
+                info = {"ts": body.stat().st_mtime}
+            self.put(key, data, info)
+        for path in (body, meta):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass  # another process migrated it first
+        return True
+
+    def sweep(self, max_tmp_age_s: float = STALE_TMP_S) -> Tuple[int, int]:
+        """Migrate every old flat-layout entry and delete abandoned temp files.
+
+        Returns (entries migrated, temp files removed). Temp files younger than
+        max_tmp_age_s may belong to a live writer and are kept.
+        """
+        migrated = removed = 0
+        for path in self.root.glob("*.bin"):
+            if (m := _LEGACY_RE.match(path.name)) and self._migrate(m.group(1)):
+                migrated += 1
+        cutoff = time.time() - max_tmp_age_s
+        for pattern in (".*.tmp", "*/*/.*.tmp"):
+            for tmp in self.root.glob(pattern):
+                try:
+                    if tmp.stat().st_mtime < cutoff:
+                        tmp.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return migrated, removed
+
+    def export_bundle(self, dest: Path) -> int:
+        """Write every valid entry to a .tar.gz bundle; returns the number of refs exported."""
+        import tarfile
+        n = 0
+        seen = set()
+        with tarfile.open(dest, "w:gz") as tar:
+            for ref_path in sorted((self.root / "refs").glob("*/*.json")):
+                key = ref_path.stem
+                hit = self.get(key)
+                if hit is None:
+                    continue
+                data, ref = hit
+                if ref["sha256"] not in seen:
+                    _add(tar, f"objects/{ref['sha256'][:2]}/{ref['sha256']}", data)
+                    seen.add(ref["sha256"])
+                _add(tar, f"refs/{key[:2]}/{key}.json", json.dumps(ref, ensure_ascii=False).encode("utf-8"))
+                n += 1
+        return n
+
+    def import_bundle(self, src: Path) -> int:
+        """Publish a bundle's entries (checksums verified), keeping newer local refs; returns refs imported."""
+        import tarfile
+        n = 0
+        with tarfile.open(src, "r:*") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                fh = tar.extractfile(member)
+                if fh is None:
+                    continue
+                data = fh.read()
+                if m := _OBJ_RE.match(member.name):
+                    if hashlib.sha256(data).hexdigest() == m.group(1):
+                        self.put_object(data)
+                elif m := _REF_RE.match(member.name):
+                    key = m.group(1)
+                    try:
+                        ref = json.loads(data)
+                    except ValueError:
+                        continue
+                    sha = str(ref.get("sha256", ""))
+                    if not _SHA_RE.match(sha) or not self._obj(sha).is_file():
+                        continue
+                    cur = self._read_ref(key)
+                    if cur is not None and float(cur.get("ts", 0)) >= float(ref.get("ts", 0)):
+                        continue
+                    _atomic_write(self._ref(key), data)
+                    n += 1
+        return n
+
+def _add(tar, name: str, data: bytes) -> None:
+    import tarfile
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
@@ -1,31 +1,62 @@
-import asyncio
 from pathlib import Path
 from datetime import date
 from typing import Optional, List
 
 import typer
 
-from .config import Settings
-from .http import AsyncHTTP
-from .storage import JSONStore, CSVStore, ParquetStore
-from .engine import SpecCrawler
-from .specs import SPEC_REGISTRY
-from .progress import ProgressReporter
-from .health import api_health
+# Command dependencies (asyncio, pydantic settings, httpx, pandas/pyarrow stores,
+# the spec registry) are imported inside each command so startup only pays for
+# what runs.
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
+cache_app = typer.Typer(help="Share the HTTP response cache between hosts.", no_args_is_help=True)
+app.add_typer(cache_app, name="cache")
 
-def _make_store(output_dir: Path, fmt: str):
+def _make_store(output_dir: Path, fmt: str, compression: Optional[str] = None,
+                rotate_mb: Optional[float] = None, rotate_by: Optional[str] = None):
+    from .storage import JSONStore, CSVStore, ParquetStore
     output_dir.mkdir(parents=True, exist_ok=True)
-    if fmt == "csv":
-        return CSVStore(output_dir)
     if fmt == "parquet":
+        if compression or rotate_mb or rotate_by:
+            raise typer.BadParameter("--compression/--rotate-* apply to json and csv output only")
         return ParquetStore(output_dir)
-    return JSONStore(output_dir)  # default
+    try:
+        # json is the default
+        return (CSVStore if fmt == "csv" else JSONStore)(output_dir, compression=compression,
+                                                         rotate_mb=rotate_mb, rotate_by=rotate_by)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+def _check_spec(spec: str):
+    from .specs import SPEC_REGISTRY
+    if spec not in SPEC_REGISTRY:
+        raise typer.BadParameter(f"Unknown spec '{spec}'. Available: {', '.join(sorted(SPEC_REGISTRY))}")
+
+def _disk_cache():
+    from .settings import Settings
+    from .cache import DiskCache
+    s = Settings()
+    cache = DiskCache(Path(s.cache_dir or (Path.home() / ".cache" / "elexon-dl" / "http")))
+    migrated, removed = cache.sweep()  # old flat entries and temp files left by killed writers
+    if migrated or removed:
+        typer.echo(f"Migrated {migrated} old-layout entries, removed {removed} stale temp files", err=True)
+    return cache
+
+def _parse_params(params: Optional[List[str]]) -> dict:
+    extra = {}
+    for kv in params or []:
+        if "=" not in kv:
+            raise typer.BadParameter(f"Bad param format: {kv}, expected key=value")
+        k, v = kv.split("=", 1)
+        extra[k] = v
+    return extra
 
 @app.command()
 def health():
-    s = Settings()
+    from .config import http_settings  # pydantic-settings only if ELEXON_* overrides need parsing
+    from .http import AsyncHTTP
+    from .health import api_health
+    s = http_settings()
     async def _run():
         async with AsyncHTTP(s) as http:
             res = await api_health(http, s)
@@ -33,6 +64,7 @@ def health():
             print(json.dumps(res, indent=2))
             if not res.get("_ok"):
                 raise typer.Exit(code=1)
+    import asyncio
     asyncio.run(_run())
 
 @app.command()
@@ -43,32 +75,116 @@ def crawl(
     output_dir: Path = typer.Option(Path("data"), help="Output directory"),
     format: str = typer.Option("json", help="json|csv|parquet"),
     progress: bool = typer.Option(True, help="Show live progress table"),
+    compression: Optional[str] = typer.Option(None, help="gzip|zstd: stream compressed, independently readable frames (json/csv)"),
+    rotate_mb: Optional[float] = typer.Option(None, help="Start a new part file past this size in MB (json/csv)"),
+    rotate_by: Optional[str] = typer.Option(None, help="day|month: one part directory per date (json/csv)"),
     params: List[str] = typer.Argument(None, help="Extra query params as key=value (overrides spec defaults)"),
 ):
-    if spec not in SPEC_REGISTRY:
-        raise typer.BadParameter(f"Unknown spec '{spec}'. Available: {', '.join(sorted(SPEC_REGISTRY))}")
+    _check_spec(spec)
+    from .settings import Settings
+    from .http import AsyncHTTP
+    from .engine import SpecCrawler
+    from .gaps import Coverage
+    from .specs import SPEC_REGISTRY
+    from .progress import ProgressReporter
 
     s = Settings()
     sd = date.fromisoformat(start_date)
     ed = date.fromisoformat(end_date)
-    store = _make_store(output_dir, format)
-    extra = {}
-    for kv in params or []:
-        if "=" not in kv:
-            raise typer.BadParameter(f"Bad param format: {kv}, expected key=value")
-        k, v = kv.split("=", 1)
-        extra[k] = v
+    store = _make_store(output_dir, format, compression, rotate_mb, rotate_by)
+    extra = _parse_params(params)
 
     async def _run():
         async with AsyncHTTP(s) as http:
             pr = ProgressReporter(http) if progress else None
             if pr: pr.start()
-            crawler = SpecCrawler(s, SPEC_REGISTRY[spec])
+            crawler = SpecCrawler(s, SPEC_REGISTRY[spec], on_fetched=Coverage(output_dir, SPEC_REGISTRY[spec]).add)
             total = 0
             async for chunk in crawler.pages(http, start_date=sd, end_date=ed, **extra):
-                store.upsert(SPEC_REGISTRY[spec].table, chunk, keys=list(SPEC_REGISTRY[spec].primary_keys))
+                store.upsert(SPEC_REGISTRY[spec].table, chunk, keys=list(SPEC_REGISTRY[spec].primary_keys), schema=SPEC_REGISTRY[spec].schema)
                 total += len(chunk)
             if pr: pr.stop()
             typer.echo(f"Wrote {total} rows to {output_dir} ({SPEC_REGISTRY[spec].table}.{format})")
 
+    import asyncio
+    asyncio.run(_run())
+
+@app.command()
+def gaps(
+    spec: str = typer.Option(..., help="Spec name (see specs.py)"),
+    start_date: str = typer.Option(..., help="YYYY-MM-DD"),
+    end_date: str = typer.Option(..., help="YYYY-MM-DD"),
+    output_dir: Path = typer.Option(Path("data"), help="Output directory"),
+    format: str = typer.Option("json", help="json|csv|parquet"),
+):
+    """List contexts (day/SP/slot × dims) neither fetched before nor found in the existing output."""
+    _check_spec(spec)
+    from .settings import Settings
+    from .gaps import missing_contexts
+    from .specs import SPEC_REGISTRY
+    es = SPEC_REGISTRY[spec]
+    store = _make_store(output_dir, format)
+    missing = missing_contexts(Settings(), es, store, start_date=date.fromisoformat(start_date), end_date=date.fromisoformat(end_date))
+    import json
+    for ctx in missing:
+        typer.echo(json.dumps(ctx))
+    typer.echo(f"{len(missing)} missing contexts in {es.table}.{format}", err=True)
+
+@app.command()
+def backfill(
+    spec: str = typer.Option(..., help="Spec name (see specs.py)"),
+    start_date: str = typer.Option(..., help="YYYY-MM-DD"),
+    end_date: str = typer.Option(..., help="YYYY-MM-DD"),
+    output_dir: Path = typer.Option(Path("data"), help="Output directory"),
+    format: str = typer.Option("json", help="json|csv|parquet"),
+    progress: bool = typer.Option(True, help="Show live progress table"),
+    compression: Optional[str] = typer.Option(None, help="gzip|zstd: stream compressed, independently readable frames (json/csv)"),
+    rotate_mb: Optional[float] = typer.Option(None, help="Start a new part file past this size in MB (json/csv)"),
+    rotate_by: Optional[str] = typer.Option(None, help="day|month: one part directory per date (json/csv)"),
+    params: List[str] = typer.Argument(None, help="Extra query params as key=value (overrides spec defaults)"),
+):
+    """Fetch only the contexts missing from the existing output."""
+    _check_spec(spec)
+    from .settings import Settings
+    from .http import AsyncHTTP
+    from .engine import SpecCrawler
+    from .gaps import Coverage, missing_contexts
+    from .specs import SPEC_REGISTRY
+    from .progress import ProgressReporter
+    s = Settings()
+    es = SPEC_REGISTRY[spec]
+    store = _make_store(output_dir, format, compression, rotate_mb, rotate_by)
+    extra = _parse_params(params)
+    missing = missing_contexts(s, es, store, start_date=date.fromisoformat(start_date), end_date=date.fromisoformat(end_date))
+    if not missing:
+        typer.echo(f"No gaps in {es.table}.{format}")
+        return
+
+    async def _run():
+        async with AsyncHTTP(s) as http:
+            pr = ProgressReporter(http) if progress else None
+            if pr: pr.start()
+            crawler = SpecCrawler(s, es, on_fetched=Coverage(output_dir, es).add)
+            total = 0
+            async for chunk in crawler.pages_for(http, missing, **extra):
+                store.upsert(es.table, chunk, keys=list(es.primary_keys), schema=es.schema)
+                total += len(chunk)
+            if pr: pr.stop()
+            typer.echo(f"Backfilled {len(missing)} contexts, wrote {total} rows to {output_dir} ({es.table}.{format})")
+
+    import asyncio
     asyncio.run(_run())
+
+@cache_app.command("export")
+def cache_export(bundle: Path = typer.Argument(..., help="Bundle to write (.tar.gz)")):
+    """Bundle every verified cache entry for pre-warming another host."""
+    n = _disk_cache().export_bundle(bundle)
+    typer.echo(f"Exported {n} cached responses to {bundle}")
+
+@cache_app.command("import")
+def cache_import(bundle: Path = typer.Argument(..., help="Bundle written by 'cache export'")):
+    """Load a bundle into the cache; bodies are checksummed, newer local entries win."""
+    if not bundle.exists():
+        raise typer.BadParameter(f"No such bundle: {bundle}")
+    n = _disk_cache().import_bundle(bundle)
+    typer.echo(f"Imported {n} cached responses from {bundle}")
@@ -1,9 +1,34 @@
+import os
+from dataclasses import dataclass, fields
 from pathlib import Path
-from pydantic import BaseSettings, Field
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Protocol, Union
 
-class Settings(BaseSettings):
-    base_url: str = Field(default="https://data.elexon.co.uk/bmrs/api/v1")
+# The validated model lives in .settings: pydantic-settings costs ~150 ms to import,
+# so only commands that need it (crawl/gaps/backfill/cache) pay for it.
+if TYPE_CHECKING:
+    from .settings import Settings
+
+ENV_PREFIX = "ELEXON_"
+
+class HTTPSettings(Protocol):
+    """What AsyncHTTP and api_health read; satisfied by Settings and Defaults."""
+    base_url: str
+    timeout_s: float
+    max_retries: int
+    backoff_base: float
+    backoff_cap: float
+    max_concurrency: int
+    rate_per_sec: float
+    user_agent: str
+    cache_enabled: bool
+    cache_dir: Optional[str]
+    cache_ttl_s: int
+    health_url: str
+
+@dataclass
+class Defaults:
+    """Default value of every setting; Settings declares its fields from these."""
+    base_url: str = "https://data.elexon.co.uk/bmrs/api/v1"
     timeout_s: float = 30.0
     max_retries: int = 3
     backoff_base: float = 0.5
@@ -16,4 +41,20 @@ class Settings(BaseSettings):
     cache_ttl_s: int = 0  # 0 => never expire
     health_url: str = "https://data.elexon.co.uk/bmrs/api/v1/health"
 
-    model_config = {"env_prefix": "ELEXON_", "extra": "ignore"}
\ No newline at end of file
+def http_settings() -> Union[Defaults, "Settings"]:
+    """Settings for short commands like `health`.
+
+    Plain Defaults when no ELEXON_* variable overrides a field (nothing to parse),
+    otherwise the validated Settings, so env values are only ever parsed by pydantic.
+    """
+    overridable = {f"{ENV_PREFIX}{f.name}".upper() for f in fields(Defaults)}
+    if any(k.upper() in overridable for k in os.environ):
+        from .settings import Settings
+        return Settings()
+    return Defaults()
+
+def __getattr__(name: str):
+    if name == "Settings":  # kept importable from here for existing callers
+        from .settings import Settings
+        return Settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
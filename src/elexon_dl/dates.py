@@ -4,8 +4,10 @@ from zoneinfo import ZoneInfo
 UK = ZoneInfo("Europe/London")
 
 def settlement_periods_in_day(d: date) -> int:
-    dt0 = datetime(d.year, d.month, d.day, 0, 0, tzinfo=UK)
-    dt1 = dt0 + timedelta(days=1)
+    # same-tzinfo arithmetic is wall-clock; compare in UTC to see the DST shift
+    dt0 = datetime(d.year, d.month, d.day, 0, 0, tzinfo=UK).astimezone(timezone.utc)
+    nd = d + timedelta(days=1)
+    dt1 = datetime(nd.year, nd.month, nd.day, 0, 0, tzinfo=UK).astimezone(timezone.utc)
     return int((dt1 - dt0).total_seconds() // 1800)
 
 def iso_from_to_for_day(d: date) -> tuple[str,str]:
@@ -3,16 +3,16 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
-from .dates import UK
 from itertools import product
-from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional
-from dateutil.parser import isoparse
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
 
-
-from .http import AsyncHTTP
+if TYPE_CHECKING:
+    from .http import AsyncHTTP
 from .dates import settlement_periods_in_day, iso_from_to_for_day
+from .schema import Schema, coerce_rows
 
 RowList = List[Mapping[str, Any]]
+REQUESTED_SLOT = "requestedPublishTime"  # slot-strategy rows record the publishTime they were requested for
 RowFilter = Callable[[RowList, Dict[str, Any]], RowList]
 Enricher  = Callable[[RowList, Dict[str, Any]], RowList]
 
@@ -21,6 +21,7 @@ class TimeStrategy:
     kind: str
     publish_slots: Optional[List[str]] = None
     slot_to_sp: Optional[Dict[str,int]] = None
+    slot_column: Optional[str] = None  # column holding the slot in rows written before REQUESTED_SLOT (gap detection)
 
 @dataclass
 class EndpointSpec:
@@ -35,6 +36,7 @@ class EndpointSpec:
     primary_keys: Iterable[str] = field(default_factory=tuple)
     row_filter: Optional[RowFilter] = None
     enricher: Optional[Enricher] = None
+    schema: Optional[Schema] = None
 
 def _dig(obj, path: Optional[str]):
     if not path:
@@ -66,10 +68,13 @@ def _iso_z(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
 
 class SpecCrawler:
-    def __init__(self, settings, spec: EndpointSpec, *, batch_size: Optional[int] = None):
+    def __init__(self, settings, spec: EndpointSpec, *, batch_size: Optional[int] = None,
+                 on_fetched: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
         self.s = settings
         self.spec = spec
         self.batch_size = batch_size or (self.s.max_concurrency * 8)
+        # called with each batch's contexts once its rows were consumed (empty responses included)
+        self.on_fetched = on_fetched
 
     def _contexts_for_day(self, d: date) -> List[Dict[str, Any]]:
         t = self.spec.time
@@ -146,6 +151,8 @@ class SpecCrawler:
                     rec.setdefault(k, v)
             if "slot_sp" in ctx:
                 rec.setdefault("settlementPeriod", ctx["slot_sp"])
+            if "publishTime" in ctx:
+                rec.setdefault(REQUESTED_SLOT, ctx["publishTime"])
             out.append(rec)
         if self.spec.enricher:
             out = self.spec.enricher(out, ctx)
@@ -164,28 +171,44 @@ class SpecCrawler:
         rows = self._enrich(rows, ctx)
         if self.spec.row_filter:
             rows = self.spec.row_filter(rows, ctx)
+        if self.spec.schema:
+            rows = coerce_rows(rows, self.spec.schema)
         return rows
 
+    def contexts(self, start_date: date, end_date: date) -> Iterator[Dict[str, Any]]:
+        d = start_date
+        while d <= end_date:
+            yield from self._contexts_for_day(d)
+            d = d + timedelta(days=1)
+
     async def pages(self, http: AsyncHTTP, *, start_date: date, end_date: date, **extra_params) -> AsyncIterator[RowList]:
+        async for chunk in self.pages_for(http, self.contexts(start_date, end_date), **extra_params):
+            yield chunk
+
+    async def pages_for(self, http: AsyncHTTP, contexts: Iterable[Dict[str, Any]], **extra_params) -> AsyncIterator[RowList]:
         sem = asyncio.Semaphore(self.s.max_concurrency)
         async def guarded(coro):
             async with sem:
                 return await coro
 
         batch: List[asyncio.Task] = []
-        d = start_date
-        while d <= end_date:
-            for ctx in self._contexts_for_day(d):
-                batch.append(asyncio.create_task(guarded(self._fetch_ctx(http, ctx, extra_params))))
-                if len(batch) >= self.batch_size:
-                    results = await asyncio.gather(*batch)
-                    batch.clear()
-                    chunk = [row for rows in results for row in rows]
-                    if chunk:
-                        yield chunk
-            d = d + timedelta(days=1)
+        done: List[Dict[str, Any]] = []
+        for ctx in contexts:
+            batch.append(asyncio.create_task(guarded(self._fetch_ctx(http, ctx, extra_params))))
+            done.append(ctx)
+            if len(batch) >= self.batch_size:
+                results = await asyncio.gather(*batch)
+                batch.clear()
+                chunk = [row for rows in results for row in rows]
+                if chunk:
+                    yield chunk
+                if self.on_fetched:
+                    self.on_fetched(done)
+                done = []
         if batch:
             results = await asyncio.gather(*batch)
             chunk = [row for rows in results for row in rows]
             if chunk:
                 yield chunk
+            if self.on_fetched:
+                self.on_fetched(done)
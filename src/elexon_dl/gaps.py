@@ -0,0 +1,99 @@
+from __future__ import annotations
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .engine import REQUESTED_SLOT, EndpointSpec, SpecCrawler, _iso_z
+from .schema import _to_ts
+
+SLOT_KINDS = ("publish_slots_fixed_utc", "halfhour_slots")
+
+def coverage_columns(spec: EndpointSpec) -> List[Tuple[str, str]]:
+    """(context key, stored column) pairs identifying which request produced a row."""
+    t = spec.time
+    if t.kind == "date_sp":
+        pairs = [("date", "date"), ("sp", "settlementPeriod")]
+    elif t.kind in ("date_only", "from_to"):
+        pairs = [("date", "date")]
+    elif t.kind in SLOT_KINDS:
+        pairs = [("publishTime", REQUESTED_SLOT)]
+    else:
+        raise ValueError(f"Unknown time strategy: {t.kind}")
+    return pairs + [(k, k) for k in spec.dims]
+
+def _norm(key: str, v: Any) -> Any:
+    if key == "date":
+        return v.isoformat()[:10] if isinstance(v, date) else str(v)[:10]
+    if key == "sp":
+        return int(float(v))
+    if key == "publishTime":
+        return _iso_z(_to_ts(v))
+    return str(v)
+
+def _ctx_key(pairs: List[Tuple[str, str]], ctx: Dict[str, Any]) -> tuple:
+    return tuple(_norm(k, ctx[k]) for k, _ in pairs)
+
+class Coverage:
+    """Append-only record of fetched contexts in <output_dir>/<table>.coverage.jsonl.
+
+    Rows can't always tell which request produced them: keyed upserts collapse rows
+    that several contexts returned, and an empty response writes nothing. Contexts
+    recorded here count as present regardless; delete the file to re-check them all.
+    """
+    def __init__(self, base: Path, spec: EndpointSpec):
+        self.path = Path(base) / f"{spec.table}.coverage.jsonl"
+        self.pairs = coverage_columns(spec)
+
+    def add(self, contexts: Iterable[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(list(_ctx_key(self.pairs, ctx))) + "\n" for ctx in contexts)
+        if lines:
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(lines)
+
+    def keys(self) -> Set[tuple]:
+        if not self.path.exists():
+            return set()
+        out: Set[tuple] = set()
+        with self.path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    out.add(tuple(json.loads(line)))
+                except ValueError:
+                    continue  # torn last line from an interrupted crawl
+        return out
+
+def present_keys(spec: EndpointSpec, store) -> Set[tuple]:
+    """Coverage keys already in the store, reading only the coverage columns."""
+    pairs = coverage_columns(spec)
+    cols = [c for _, c in pairs]
+    # rows written before slots were stamped identify them by the spec's slot_column, if any
+    legacy = spec.time.slot_column if REQUESTED_SLOT in cols else None
+    df = store.read_columns(spec.table, cols + ([legacy] if legacy else []))
+    if df.empty:
+        return set()
+    if legacy and legacy in df.columns:
+        df[REQUESTED_SLOT] = df[REQUESTED_SLOT].where(df[REQUESTED_SLOT].notna(), df[legacy]) \
+            if REQUESTED_SLOT in df.columns else df[legacy]
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise ValueError(f"Table '{spec.table}' has no column(s) {missing}; cannot detect gaps")
+    df = df[cols].dropna().drop_duplicates()
+    out: Set[tuple] = set()
+    for row in df.itertuples(index=False, name=None):
+        try:
+            out.add(tuple(_norm(k, v) for (k, _), v in zip(pairs, row)))
+        except (ValueError, TypeError):
+            continue
+    return out
+
+def missing_contexts(settings, spec: EndpointSpec, store, *, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+    """Contexts in [start_date, end_date] neither recorded in the table's Coverage nor found in its rows.
+
+    Tables crawled before coverage was recorded fall back to their rows alone, so a
+    context whose response was empty is reported (and re-requested) until fetched once more.
+    """
+    pairs = coverage_columns(spec)
+    have = present_keys(spec, store) | Coverage(store.base, spec).keys()
+    crawler = SpecCrawler(settings, spec)
+    return [ctx for ctx in crawler.contexts(start_date, end_date) if _ctx_key(pairs, ctx) not in have]
@@ -1,8 +1,8 @@
 from typing import Any, Dict
 from .http import AsyncHTTP
-from .config import Settings
+from .config import HTTPSettings
 
-async def api_health(http: AsyncHTTP, s: Settings) -> Dict[str, Any]:
+async def api_health(http: AsyncHTTP, s: HTTPSettings) -> Dict[str, Any]:
     url = s.health_url
     resp = await http.get(url)
     ct = resp.headers.get("content-type","")
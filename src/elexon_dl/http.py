@@ -3,7 +3,8 @@ from typing import Any, Dict, Optional, Tuple
 from collections import deque
 from pathlib import Path
 import httpx
-from .config import Settings
+from .cache import DiskCache
+from .config import HTTPSettings
 
 RETRIABLE = {429, 500, 502, 503, 504}
 
@@ -58,19 +59,17 @@ class HTTPMetrics:
         return {"count": n, "avg_latency": avg, "max_latency": mx}
 
 class AsyncHTTP:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: HTTPSettings):
         self.s = settings
         self._client: Optional[httpx.AsyncClient] = None
         self._limiter = RateLimiter(self.s.rate_per_sec)
         self.metrics = HTTPMetrics()
         # NEW: cache filesystem prep
-        self._cache_dir: Optional[Path] = None
+        self._cache: Optional[DiskCache] = None
         if self.s.cache_enabled:
             d = Path(self.s.cache_dir or (Path.home() / ".cache" / "elexon-dl" / "http"))
-            d.mkdir(parents=True, exist_ok=True)
-            self._cache_dir = d
-        # convenience
-        self._ttl = None if not self.s.cache_ttl_s or self.s.cache_ttl_s <= 0 else int(self.s.cache_ttl_s)
+            ttl = None if not self.s.cache_ttl_s or self.s.cache_ttl_s <= 0 else int(self.s.cache_ttl_s)
+            self._cache = DiskCache(d, ttl)
 
     async def __aenter__(self):
         headers = {"User-Agent": self.s.user_agent}
@@ -98,45 +97,31 @@ class AsyncHTTP:
 
     # NEW: try read cached response from disk
     def _cache_read(self, url: str, params: Dict[str, Any]) -> Optional[httpx.Response]:
-        if not self._cache_dir:
+        if not self._cache:
             return None
-        key = _cache_key(url, params)
-        path = self._cache_dir / f"{key}.bin"
-        meta = self._cache_dir / f"{key}.meta.json"
-        if not path.exists():
-            return None
-        if self._ttl is not None:
-            try:
-                m = json.loads(meta.read_text("utf-8"))
-                if (_now() - float(m.get("ts", 0))) > self._ttl:
-                    return None  # expired
-            except Exception:
-                return None
-        try:
-            data = path.read_bytes()
-            req = httpx.Request("GET", url, params=params, headers={"User-Agent": self.s.user_agent})
-            # Build a Response object as if it came from the network
-            resp = httpx.Response(200, request=req, content=data)
-            # Mark it so you can introspect later if you like
-            resp.extensions["from_cache"] = True
-            return resp
-        except Exception:
+        hit = self._cache.get(_cache_key(url, params))
+        if hit is None:
             return None
+        data, meta = hit
+        req = httpx.Request("GET", url, params=params, headers={"User-Agent": self.s.user_agent})
+        headers = {"content-type": meta["content_type"]} if meta.get("content_type") else None
+        # Build a Response object as if it came from the network
+        resp = httpx.Response(200, request=req, content=data, headers=headers)
+        # Mark it so you can introspect later if you like
+        resp.extensions["from_cache"] = True
+        return resp
 
     # NEW: write response to disk cache
     def _cache_write(self, url: str, params: Dict[str, Any], resp: httpx.Response) -> None:
-        if not self._cache_dir:
+        if not self._cache:
             return
         if resp.status_code != 200:
             return
-        key = _cache_key(url, params)
-        path = self._cache_dir / f"{key}.bin"
-        meta = self._cache_dir / f"{key}.meta.json"
+        meta = {"ts": _now(), "url": url, "params": params, "content_type": resp.headers.get("content-type")}
         try:
-            path.write_bytes(resp.content)
-            meta.write_text(json.dumps({"ts": _now(), "url": url, "params": params}, ensure_ascii=False))
-        except Exception:
-            # best-effort; silence disk races
+            self._cache.put(_cache_key(url, params), resp.content, meta)
+        except OSError:
+            # best-effort: a failed publish leaves no partial entry behind
             pass
 
     async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
@@ -144,7 +129,7 @@ class AsyncHTTP:
         params = params or {}
 
         # Try cache first
-        if self._cache_dir:
+        if self._cache:
             cached = self._cache_read(url, params)
             if cached is not None:
                 # record near-zero latency for metrics
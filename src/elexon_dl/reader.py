@@ -0,0 +1,124 @@
+from __future__ import annotations
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Union
+
+from .schema import Schema
+from .storage import CSVStore, Filter, JSONStore, ParquetStore
+
+DateLike = Union[str, date]
+
+_STORES = {"json": JSONStore, "csv": CSVStore, "parquet": ParquetStore}
+
+def _store(output_dir: Path, fmt: str):
+    if fmt not in _STORES:
+        raise ValueError(f"Unknown format '{fmt}'. Available: {', '.join(_STORES)}")
+    return _STORES[fmt](Path(output_dir))
+
+def _schema_for(table: str) -> Optional[Schema]:
+    from .specs import SPEC_REGISTRY
+    return next((sp.schema for sp in SPEC_REGISTRY.values() if sp.table == table), None)
+
+def _keys_for(store, table: str, keys: Optional[Sequence[str]]) -> List[str]:
+    """keys as given, else the spec's primary_keys for append-only (segmented) tables."""
+    if keys is not None:
+        return list(keys)
+    if not (hasattr(store, "segmented") and store.segmented(table)):
+        return []  # plain files and Parquet were deduped on upsert
+    from .specs import SPEC_REGISTRY
+    return next((list(sp.primary_keys) for sp in SPEC_REGISTRY.values() if sp.table == table), [])
+
+def _with_keys(columns: Optional[Sequence[str]], keys: Sequence[str]) -> Optional[List[str]]:
+    return list(dict.fromkeys([*columns, *keys])) if columns is not None else None
+
+def _filters(start: Optional[DateLike], end: Optional[DateLike], filters: Optional[Sequence[Filter]], date_column: str) -> List[Filter]:
+    out = list(filters or [])
+    if start is not None:
+        out.append((date_column, ">=", start.isoformat() if isinstance(start, date) else start))
+    if end is not None:
+        out.append((date_column, "<=", end.isoformat() if isinstance(end, date) else end))
+    return out
+
+def iter_read(
+    table: str,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Sequence[Filter]] = None,
+    *,
+    output_dir: Union[str, Path] = "data",
+    format: str = "json",
+    date_column: str = "date",
+    as_arrow: bool = False,
+    batch_rows: int = 100_000,
+    schema: Optional[Schema] = None,
+    keys: Optional[Sequence[str]] = None,
+) -> Iterator[Any]:
+    """Stream a stored table in batches (pandas DataFrames, or Arrow RecordBatches with as_arrow).
+
+    start/end are inclusive bounds on date_column; filters are (column, op, value) tuples with
+    ops ==, !=, <, <=, >, >=, in, not in. Parquet pushes both down to row groups; JSONL/CSV
+    parse only the needed columns and filter per batch. Output is typed by schema
+    (default: the schema of the spec writing this table).
+
+    keys keeps the last row per key within each batch only; copies of a key in different
+    batches are all yielded (use read() to resolve them across the table). Defaults to the
+    spec's primary_keys for segmented tables, which are append-only; pass keys=() to keep every row.
+    """
+    store = _store(Path(output_dir), format)
+    flt = _filters(start, end, filters, date_column)
+    keys = _keys_for(store, table, keys)
+    cols = _with_keys(columns, keys)
+    if isinstance(store, ParquetStore) and as_arrow and not keys:
+        yield from store.scan_arrow(table, columns=columns, filters=flt, batch_rows=batch_rows)
+        return
+    schema = schema if schema is not None else _schema_for(table)
+    for df in store.scan(table, columns=cols, filters=flt, batch_rows=batch_rows, schema=schema):
+        if keys and all(k in df.columns for k in keys):
+            df = df.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+        if columns is not None and cols != columns:
+            df = df[[c for c in columns if c in df.columns]]
+        if as_arrow:
+            import pyarrow as pa
+            yield from pa.Table.from_pandas(df, preserve_index=False).to_batches()
+        else:
+            yield df
+
+def read(
+    table: str,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Sequence[Filter]] = None,
+    *,
+    output_dir: Union[str, Path] = "data",
+    format: str = "json",
+    date_column: str = "date",
+    as_arrow: bool = False,
+    schema: Optional[Schema] = None,
+    keys: Optional[Sequence[str]] = None,
+) -> Any:
+    """Load a stored table into one pandas DataFrame (or Arrow Table); see iter_read.
+
+    keys keeps only the last row per key across the whole table, which resolves re-crawled
+    rows in append-only (compressed/rotated) stores; like iter_read it defaults to the spec's
+    primary_keys for those tables, and keys=() keeps every row.
+    """
+    keys = _keys_for(_store(Path(output_dir), format), table, keys)
+    cols = _with_keys(columns, keys)
+    parts = list(iter_read(table, start, end, cols, filters, output_dir=output_dir, format=format,
+                           date_column=date_column, as_arrow=as_arrow and not keys, schema=schema, keys=keys))
+    if as_arrow and not keys:
+        import pyarrow as pa
+        return pa.Table.from_batches(parts) if parts else pa.table({c: [] for c in columns or []})
+    import pandas as pd
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(cols or []))
+    if keys:
+        if len(df) and all(k in df.columns for k in keys):
+            df = df.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+    if as_arrow:
+        import pyarrow as pa
+        return pa.Table.from_pandas(df, preserve_index=False)
+    return df
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Mapping
+
+Schema = Dict[str, str]  # column -> one of COLUMN_TYPES; undeclared columns are inferred
+COLUMN_TYPES = ("string", "category", "int32", "int64", "float32", "float64", "bool", "date", "timestamp")
+
+RowList = List[Mapping[str, Any]]
+
+def _to_ts(v: Any) -> datetime:
+    if isinstance(v, datetime):
+        dt = v
+    else:
+        from dateutil.parser import isoparse
+        dt = isoparse(str(v))
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+def _to_date(v: Any) -> date:
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    return date.fromisoformat(str(v)[:10])
+
+def _to_bool(v: Any) -> bool:
+    if isinstance(v, str):
+        return v.strip().lower() in ("true", "1", "y", "yes")
+    return bool(v)
+
+_COERCE: Dict[str, Callable[[Any], Any]] = {
+    "string": str, "category": str,
+    "int32": lambda v: int(float(v)), "int64": lambda v: int(float(v)),
+    "float32": float, "float64": float,
+    "bool": _to_bool, "date": _to_date, "timestamp": _to_ts,
+}
+
+def coerce_rows(rows: RowList, schema: Schema) -> RowList:
+    """Convert declared columns to Python values of their type; unparseable values become None."""
+    out: RowList = []
+    for r in rows:
+        rec = dict(r)
+        for col, kind in schema.items():
+            v = rec.get(col)
+            if v is None:
+                continue
+            try:
+                rec[col] = _COERCE[kind](v)
+            except (ValueError, TypeError, OverflowError):
+                rec[col] = None
+        out.append(rec)
+    return out
+
+def json_default(o: Any) -> str:
+    """json.dumps hook writing timestamps as ISO-8601 UTC with a Z suffix."""
+    if isinstance(o, datetime):
+        return _to_ts(o).isoformat().replace("+00:00", "Z")
+    if isinstance(o, date):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def arrow_type(kind: str):
+    import pyarrow as pa
+    return {
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "int32": pa.int32(), "int64": pa.int64(),
+        "float32": pa.float32(), "float64": pa.float64(),
+        "bool": pa.bool_(), "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }[kind]
+
+def arrow_cast(tbl, schema: Schema):
+    """Cast declared columns of a pyarrow Table; others keep their inferred type."""
+    for col, kind in schema.items():
+        if col not in tbl.column_names:
+            continue
+        target = arrow_type(kind)
+        i = tbl.column_names.index(col)
+        if tbl.schema.field(i).type != target:
+            tbl = tbl.set_column(i, col, tbl.column(i).cast(target))
+    return tbl
+
+def pandas_cast(df, schema: Schema):
+    """Cast declared columns of a DataFrame (e.g. as read back from CSV/JSONL)."""
+    import pandas as pd
+    df = df.copy()
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if kind == "timestamp":
+            df[col] = pd.to_datetime(s, utc=True, format="ISO8601", errors="coerce")
+        elif kind == "date":
+            df[col] = pd.to_datetime(s.astype(str).str[:10], format="%Y-%m-%d", errors="coerce").dt.date
+        elif kind in ("int32", "int64"):
+            df[col] = pd.to_numeric(s, errors="coerce").astype("Int32" if kind == "int32" else "Int64")
+        elif kind in ("float32", "float64"):
+            df[col] = pd.to_numeric(s, errors="coerce").astype(kind)
+        elif kind == "category":
+            df[col] = s.astype("category")
+        elif kind == "bool":
+            df[col] = s.map(lambda v: None if pd.isna(v) else _to_bool(v)).astype("boolean")
+    return df
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import json
+from datetime import date
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+CODECS = ("gzip", "zstd")
+ROTATE_BY = ("day", "month")
+INDEX = "_index.jsonl"
+
+_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+# encode(records, columns, header) -> bytes of one uncompressed frame
+Encoder = Callable[[List[Mapping[str, Any]], Optional[List[str]], bool], bytes]
+
+def _compress(codec: Optional[str], data: bytes) -> bytes:
+    if codec == "gzip":
+        import gzip
+        return gzip.compress(data, mtime=0)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+def _decompress(codec: Optional[str], data: bytes) -> bytes:
+    if codec == "gzip":
+        import gzip
+        return gzip.decompress(data)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+def _date_str(v: Any) -> Optional[str]:
+    if v is None:
+        return None
+    return v.isoformat() if isinstance(v, date) else str(v)
+
+class Segments:
+    """Append-only part files of independently compressed frames, plus a per-table index.
+
+    Each write appends one frame per partition to the table's current part file
+    (a new part starts past rotate_bytes, per rotate_by date, or when CSV columns
+    change). Concatenated gzip members / zstd frames are themselves valid .gz/.zst
+    files. <table>/_index.jsonl gets one line per frame - file, offset, length,
+    rows and min/max of date_column - written after the frame, so readers can
+    prune by date, seek straight to frames and decode them in parallel.
+    """
+    def __init__(self, root: Path, ext: str, *, compression: Optional[str] = None, rotate_mb: Optional[float] = None,
+                 rotate_by: Optional[str] = None, date_column: str = "date"):
+        if compression not in (None, *CODECS):
+            raise ValueError(f"Unknown compression '{compression}'. Available: {', '.join(CODECS)}")
+        if rotate_by not in (None, *ROTATE_BY):
+            raise ValueError(f"Unknown rotate_by '{rotate_by}'. Available: {', '.join(ROTATE_BY)}")
+        if compression == "zstd" and find_spec("zstandard") is None:
+            raise RuntimeError("zstandard not installed. Install with 'pip install elexon-dl[zstd]'")
+        self.root = Path(root)
+        self.ext = ext
+        self.compression = compression
+        self.rotate_bytes = int(rotate_mb * 1024 * 1024) if rotate_mb else None
+        self.rotate_by = rotate_by
+        self.date_column = date_column
+        self._current: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._loaded: set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.compression or self.rotate_bytes or self.rotate_by)
+
+    def exists(self, table: str) -> bool:
+        return (self.root / table / INDEX).exists()
+
+    def frames(self, table: str) -> List[Dict[str, Any]]:
+        path = self.root / table / INDEX
+        if not path.exists():
+            return []
+        out = []
+        with path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue  # torn final line from an interrupted write
+        return out
+
+    def _load(self, table: str) -> None:
+        if table in self._loaded:
+            return
+        for fr in self.frames(table):
+            self._current[(table, fr["partition"])] = {"file": fr["file"], "seq": fr["seq"], "columns": fr.get("columns")}
+        self._loaded.add(table)
+
+    def _partition(self, rec: Mapping[str, Any]) -> str:
+        if not self.rotate_by:
+            return ""
+        d = _date_str(rec.get(self.date_column))
+        if not d:
+            return f"{self.date_column}=unknown"
+        return f"{self.date_column}={d[:10] if self.rotate_by == 'day' else d[:7]}"
+
+    def append(self, table: str, records: List[Mapping[str, Any]], encode: Encoder, with_columns: bool = False) -> None:
+        self._load(table)
+        groups: Dict[str, List[Mapping[str, Any]]] = {}
+        for rec in records:
+            groups.setdefault(self._partition(rec), []).append(rec)
+        for part, recs in groups.items():
+            self._append_frame(table, part, recs, encode, with_columns)
+
+    def _append_frame(self, table: str, part: str, recs: List[Mapping[str, Any]], encode: Encoder, with_columns: bool) -> None:
+        cols = list(dict.fromkeys(k for r in recs for k in r)) if with_columns else None
+        cur = self._current.get((table, part))
+        frame = _compress(self.compression, encode(recs, cols, False))
+        new_file = (
+            cur is None
+            or (with_columns and cur["columns"] != cols)
+            or (self.rotate_bytes is not None
+                and (self.root / table / cur["file"]).stat().st_size + len(frame) > self.rotate_bytes)
+        )
+        if new_file:
+            seq = 0 if cur is None else cur["seq"] + 1
+            name = f"part-{seq:05d}.{self.ext}{_SUFFIX[self.compression]}"
+            cur = {"file": f"{part}/{name}" if part else name, "seq": seq, "columns": cols}
+            self._current[(table, part)] = cur
+            if with_columns:  # first frame of a CSV part carries its header
+                frame = _compress(self.compression, encode(recs, cols, True))
+        assert cur is not None  # new_file whenever there was no current part
+        path = self.root / table / cur["file"]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("ab") as fh:
+            offset = fh.tell()
+            fh.write(frame)
+        dates = [d for d in (_date_str(r.get(self.date_column)) for r in recs) if d]
+        entry = {"file": cur["file"], "partition": part, "seq": cur["seq"], "offset": offset, "length": len(frame),
+                 "rows": len(recs), "codec": self.compression, "min": min(dates, default=None),
+                 "max": max(dates, default=None)}
+        if with_columns:
+            entry.update(columns=cols, header=new_file)
+        with (self.root / table / INDEX).open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry) + "\n")
+
+    def read(self, table: str, lo: Optional[str] = None, hi: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+        """Yield (index entry, decompressed bytes) for frames overlapping [lo, hi] on date_column."""
+        for fr in self.frames(table):
+            if fr["min"] is not None and ((hi is not None and fr["min"][:10] > hi[:10])
+                                          or (lo is not None and fr["max"][:10] < lo[:10])):
+                continue
+            with (self.root / table / fr["file"]).open("rb") as fh:
+                fh.seek(fr["offset"])
+                data = fh.read(fr["length"])
+            yield fr, _decompress(fr["codec"], data)
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .config import ENV_PREFIX, Defaults
+
+_D = Defaults()
+
+class Settings(BaseSettings):
+    """Validated settings; each field can be set from the environment as ELEXON_<FIELD>."""
+    base_url: str = _D.base_url
+    timeout_s: float = _D.timeout_s
+    max_retries: int = _D.max_retries
+    backoff_base: float = _D.backoff_base
+    backoff_cap: float = _D.backoff_cap
+    max_concurrency: int = _D.max_concurrency
+    rate_per_sec: float = _D.rate_per_sec
+    user_agent: str = _D.user_agent
+    cache_enabled: bool = _D.cache_enabled
+    cache_dir: Optional[str] = _D.cache_dir
+    cache_ttl_s: int = _D.cache_ttl_s
+    health_url: str = _D.health_url
+
+    model_config = SettingsConfigDict(env_prefix=ENV_PREFIX, extra="ignore")
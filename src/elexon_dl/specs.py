@@ -5,6 +5,9 @@ from .filters import exact_sp_filter, within_dayahead_window, enrich_publish_eff
 
 SPEC_REGISTRY: Dict[str, EndpointSpec] = {}
 
+# Columns every settlement-period dataset carries ("date" is stamped from the request context).
+_SP_COLS = {"date": "date", "settlementDate": "date", "settlementPeriod": "int32", "startTime": "timestamp"}
+
 SPEC_REGISTRY["isp_stack"] = EndpointSpec(
     name="isp_stack",
     path_template="/balancing/settlement/stack/all/{bidOfferType}/{date}/{sp}",
@@ -14,6 +17,11 @@ SPEC_REGISTRY["isp_stack"] = EndpointSpec(
     items_path="data",
     table="isp_stack",
     primary_keys=("createdDateTime", "sequenceNumber"),
+    schema={**_SP_COLS, "bidOfferType": "category", "createdDateTime": "timestamp", "sequenceNumber": "int32",
+            "bidOfferPairId": "int32", "originalPrice": "float64", "finalPrice": "float64",
+            "volume": "float32", "dmatAdjustedVolume": "float32", "arbitrageAdjustedVolume": "float32",
+            "nivAdjustedVolume": "float32", "parAdjustedVolume": "float32", "tlmAdjustedVolume": "float32",
+            "transmissionLossMultiplier": "float32"},
 )
 
 SPEC_REGISTRY["bidoffer_price_acceptances"] = EndpointSpec(
@@ -25,6 +33,7 @@ SPEC_REGISTRY["bidoffer_price_acceptances"] = EndpointSpec(
     table="bidoffer_price_acceptances",
     primary_keys=("acceptanceTime", "bidOfferPairId", "acceptanceNumber"),
     row_filter=exact_sp_filter,
+    schema={**_SP_COLS, "acceptanceTime": "timestamp", "bidOfferPairId": "int32", "acceptanceNumber": "int64"},
 )
 
 SPEC_REGISTRY["bidoffer_level_acceptances"] = EndpointSpec(
@@ -36,18 +45,23 @@ SPEC_REGISTRY["bidoffer_level_acceptances"] = EndpointSpec(
     table="bidoffer_level_acceptances",
     primary_keys=("timeFrom", "timeTo", "acceptanceNumber"),
     row_filter=exact_sp_filter,
+    schema={**_SP_COLS, "timeFrom": "timestamp", "timeTo": "timestamp", "acceptanceTime": "timestamp",
+            "acceptanceNumber": "int64", "levelFrom": "int32", "levelTo": "int32", "bmUnit": "category",
+            "nationalGridBmUnit": "category"},
 )
 
 SPEC_REGISTRY["dayahead_demand_history"] = EndpointSpec(
     name="dayahead_demand_history",
     path_template="/forecast/demand/day-ahead/history",
     query_template={"publishTime":"{publishTime}"},
-    time=TimeStrategy(kind="halfhour_slots"),
+    time=TimeStrategy(kind="halfhour_slots"),  # no slot_column: payload publishTime is the latest earlier publish
     items_path="data",
     table="dayahead_demand_history",
     primary_keys=("publishTimeEffective","startTime"),
     enricher=enrich_publish_effective,
     row_filter=within_dayahead_window,
+    schema={**_SP_COLS, "requestedPublishTime": "timestamp", "publishTime": "timestamp", "publishTimeEffective": "timestamp",
+            "transmissionDemand": "int32", "nationalDemand": "int32", "boundary": "category"},
 )
 
 SPEC_REGISTRY["wind_history"] = EndpointSpec(
@@ -57,23 +71,26 @@ SPEC_REGISTRY["wind_history"] = EndpointSpec(
     time=TimeStrategy(
         kind="publish_slots_fixed_utc",
         publish_slots=["03:30","05:30","08:30","10:30","12:30","16:30","19:30","23:30"],  # UTC
+        slot_column="publishTime",  # fixed slots match the published forecast times
     ),
     items_path="data",
     table="wind_history",
     primary_keys=("publishTime","startTime"),
     enricher=enrich_publish_effective,     # stamps effective publish time
     row_filter=within_dayahead_window,     # keep rows in [publish+30m, publish+24h]
+    schema={**_SP_COLS, "requestedPublishTime": "timestamp", "publishTime": "timestamp", "publishTimeEffective": "timestamp", "generation": "float32"},
 )
 
 SPEC_REGISTRY["wind_evolution"] = EndpointSpec(
     name="wind_evolution",
     path_template="/forecast/generation/wind/evolution",
     query_template={"startTime":"{publishTime}", "format":"json"},
-    time=TimeStrategy(kind="halfhour_slots"),
+    time=TimeStrategy(kind="halfhour_slots", slot_column="startTime"),  # slot is the forecast startTime
     items_path="data",
     table="wind_evolution",
     primary_keys=("startTime","publishTime"),
     row_filter=wind_evolution_top8,
+    schema={**_SP_COLS, "requestedPublishTime": "timestamp", "publishTime": "timestamp", "generation": "float32"},
 )
 
 SPEC_REGISTRY["agpt"] = EndpointSpec(
@@ -84,6 +101,7 @@ SPEC_REGISTRY["agpt"] = EndpointSpec(
     items_path="data",
     table="agpt",
     primary_keys=("startTime","settlementDate","settlementPeriod"),
+    schema={**_SP_COLS, "publishTime": "timestamp", "psrType": "category", "businessType": "category", "quantity": "float32"},
 )
 
 SPEC_REGISTRY["agws"] = EndpointSpec(
@@ -94,6 +112,7 @@ SPEC_REGISTRY["agws"] = EndpointSpec(
     items_path="data",
     table="agws",
     primary_keys=("startTime","settlementDate","settlementPeriod"),
+    schema={**_SP_COLS, "publishTime": "timestamp", "psrType": "category", "businessType": "category", "quantity": "float32"},
 )
 
 SPEC_REGISTRY["system_prices"] = EndpointSpec(
@@ -103,6 +122,8 @@ SPEC_REGISTRY["system_prices"] = EndpointSpec(
     items_path="data",
     table="system_prices",
     primary_keys=("settlementDate","settlementPeriod","priceType"),
+    schema={**_SP_COLS, "createdDateTime": "timestamp", "systemSellPrice": "float64", "systemBuyPrice": "float64",
+            "netImbalanceVolume": "float32", "priceType": "category"},
 )
 
 SPEC_REGISTRY["demand_outturn"] = EndpointSpec(
@@ -113,6 +134,8 @@ SPEC_REGISTRY["demand_outturn"] = EndpointSpec(
     items_path="data",
     table="demand_outturn",
     primary_keys=("settlementDate","settlementPeriod"),
+    schema={**_SP_COLS, "publishTime": "timestamp", "initialDemandOutturn": "int32",
+            "initialTransmissionSystemDemandOutturn": "int32"},
 )
 
 SPEC_REGISTRY["netbsad"] = EndpointSpec(
@@ -123,4 +146,5 @@ SPEC_REGISTRY["netbsad"] = EndpointSpec(
     items_path="data",
     table="netbsad",
     primary_keys=("publishTime","recordId"),
+    schema={**_SP_COLS, "publishTime": "timestamp"},
 )
@@ -1,69 +1,339 @@
+from __future__ import annotations
+from datetime import date, datetime
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Iterable, Mapping, Any, Optional, List
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, Any, Optional, List, Sequence, Tuple
 import json
-import pandas as pd
+import operator
 
-try:
-    import pyarrow as pa  # type: ignore
-    import pyarrow.parquet as pq  # type: ignore
-    _HAS_PARQUET = True
-except Exception:
-    _HAS_PARQUET = False
+from .schema import Schema, arrow_cast, coerce_rows, json_default, pandas_cast
+from .segments import Segments
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# pandas/pyarrow are imported where used so JSONL appends and `--help` don't pay for them
+_HAS_PARQUET = find_spec("pyarrow") is not None
+
+Filter = Tuple[str, str, Any]  # (column, op, value), pyarrow-style
+_OPS = {"==": operator.eq, "=": operator.eq, "!=": operator.ne, "<": operator.lt,
+        "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+def _needed(columns: Optional[Sequence[str]], filters: Optional[Sequence[Filter]]) -> Optional[List[str]]:
+    if columns is None:
+        return None
+    return list(dict.fromkeys([*columns, *(f[0] for f in filters or ())]))
+
+def _comparable(val: Any, declared: Optional[str] = None) -> Tuple[Optional[str], Any]:
+    """Filter value as (kind, value) comparable with ISO strings read from JSONL/CSV.
+
+    Values for timestamp-declared columns compare as instants, since stored ISO
+    strings may differ in precision (`...00Z` vs `...00.000Z`).
+    """
+    import pandas as pd
+    if isinstance(val, datetime) or (declared == "timestamp" and isinstance(val, str)):
+        ts = pd.Timestamp(val)
+        return "timestamp", ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    if isinstance(val, date):
+        return "date", val.isoformat()
+    return None, val
+
+def _as_kind(s: pd.Series, kind: Optional[str]) -> pd.Series:
+    import pandas as pd
+    if kind == "timestamp":
+        return pd.to_datetime(s, utc=True, format="ISO8601", errors="coerce")
+    if kind == "date":
+        return s.map(lambda v: v if v is None or (isinstance(v, float) and v != v) else
+                     (v.isoformat() if isinstance(v, date) else str(v))[:10])
+    return s
+
+def _mask(df: pd.DataFrame, filters: Sequence[Filter], schema: Optional[Schema] = None) -> pd.Series:
+    import pandas as pd
+    m = pd.Series(True, index=df.index)
+    for col, op, val in filters:
+        if col not in df.columns:
+            return pd.Series(False, index=df.index)
+        declared = (schema or {}).get(col)
+        if op in ("in", "not in"):
+            pairs = [_comparable(v, declared) for v in val]
+            kind = next((k for k, _ in pairs if k), None)
+            hit = _as_kind(df[col], kind).isin([v for _, v in pairs])
+            m &= hit if op == "in" else ~hit
+        else:
+            kind, val = _comparable(val, declared)
+            s = _as_kind(df[col], kind)
+            ok = s.notna()
+            hit = pd.Series(False, index=df.index)
+            hit[ok] = _OPS[op](s[ok], val)
+            m &= hit
+    return m
+
+def _select(df: pd.DataFrame, columns: Optional[Sequence[str]], filters: Optional[Sequence[Filter]],
+            schema: Optional[Schema] = None) -> pd.DataFrame:
+    if filters:
+        df = df[_mask(df, filters, schema)]
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df.reset_index(drop=True)
+
+def _date_range(filters: Optional[Sequence[Filter]], column: str) -> Tuple[Optional[str], Optional[str]]:
+    """Bounds on column implied by filters, for pruning segment frames."""
+    lo = hi = None
+    for col, op, val in filters or ():
+        if col != column or op not in ("==", "=", ">=", ">", "<=", "<"):
+            continue
+        # frames are pruned on the YYYY-MM-DD prefix only, which never drops an overlapping frame
+        v = (val.isoformat() if isinstance(val, date) else str(val))[:10]
+        if op in ("==", "=", ">=", ">"):
+            lo = v if lo is None else max(lo, v)
+        if op in ("==", "=", "<=", "<"):
+            hi = v if hi is None else min(hi, v)
+    return lo, hi
+
+def _dedupe(records: List[Mapping[str, Any]], keys: Optional[List[str]]) -> List[Mapping[str, Any]]:
+    if not keys:
+        return list(records)
+    return list({tuple(r.get(k) for k in keys): r for r in records}.values())
+
+def _encode_jsonl(records: List[Mapping[str, Any]], columns: Optional[List[str]], header: bool) -> bytes:
+    return "".join(json.dumps(rec, ensure_ascii=False, default=json_default) + "\n" for rec in records).encode("utf-8")
+
+def _csv_value(v: Any) -> Any:
+    if v is None:
+        return ""
+    if isinstance(v, date):
+        return json_default(v)  # same ISO-8601/Z text as JSONL, so both compare alike
+    return v
+
+def _csv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Datetime columns rendered as json_default writes them, for DataFrame.to_csv."""
+    import pandas as pd
+    out = df
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            if out is df:
+                out = df.copy()
+            out[col] = df[col].map(lambda v: None if pd.isna(v) else json_default(v.to_pydatetime()))
+    return out
+
+def _encode_csv(records: List[Mapping[str, Any]], columns: Optional[List[str]], header: bool) -> bytes:
+    import csv, io
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=columns or [], lineterminator="\n")
+    if header:
+        w.writeheader()
+    for rec in records:
+        w.writerow({k: _csv_value(v) for k, v in rec.items()})
+    return buf.getvalue().encode("utf-8")
 
 class JSONStore:
-    def __init__(self, base: Path):
+    def __init__(self, base: Path, *, compression: Optional[str] = None, rotate_mb: Optional[float] = None,
+                 rotate_by: Optional[str] = None, date_column: str = "date"):
         self.base = Path(base)
         self.base.mkdir(parents=True, exist_ok=True)
+        self.segments = Segments(self.base, "jsonl", compression=compression, rotate_mb=rotate_mb,
+                                 rotate_by=rotate_by, date_column=date_column)
     def _path(self, table: str) -> Path:
         return self.base / f"{table}.jsonl"
-    def upsert(self, table: str, records: List[Mapping[str, Any]], keys: Optional[List[str]] = None):
+    def segmented(self, table: str) -> bool:
+        """Append-only <table>/part-*.jsonl[.gz|.zst] layout (chosen by options, or found on disk)."""
+        return self.segments.enabled or self.segments.exists(table)
+    def upsert(self, table: str, records: List[Mapping[str, Any]], keys: Optional[List[str]] = None,
+               schema: Optional[Schema] = None):
         if not records:
             return
+        if self.segmented(table):
+            # streaming: keys dedupe within the chunk; read(keys=...) resolves re-crawls
+            self.segments.append(table, _dedupe(records, keys), _encode_jsonl)
+            return
         path = self._path(table)
         if keys and path.exists():
-            old = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
             import pandas as pd
+            old = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+            if schema:
+                old = coerce_rows(old, schema)  # keys must compare like the typed new rows
             merged = pd.DataFrame(old + list(records))
             merged = merged.drop_duplicates(subset=keys, keep="last")
-            path.write_text("\n".join(json.dumps(rec, ensure_ascii=False) for rec in merged.to_dict(orient="records")) + "\n", encoding="utf-8")
+            merged = merged.astype(object).where(merged.notna(), None)  # NaT/NaN -> null, not "NaT"/NaN
+            path.write_text("\n".join(json.dumps(rec, ensure_ascii=False, default=json_default) for rec in merged.to_dict(orient="records")) + "\n", encoding="utf-8")
         else:
             with path.open("a", encoding="utf-8") as fh:
                 for rec in records:
-                    fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    fh.write(json.dumps(rec, ensure_ascii=False, default=json_default) + "\n")
+    def _lines(self, table: str, filters: Optional[Sequence[Filter]] = None) -> Iterator[str]:
+        # a table segmented after a plain crawl keeps its older rows in <table>.jsonl;
+        # read that first so re-crawled rows in the segments win read(keys=...)
+        path = self._path(table)
+        if path.exists():
+            with path.open("r", encoding="utf-8") as fh:
+                yield from fh
+        if self.segmented(table):
+            lo, hi = _date_range(filters, self.segments.date_column)
+            for _, data in self.segments.read(table, lo, hi):
+                yield from data.decode("utf-8").splitlines()
+    def read_columns(self, table: str, columns: List[str]) -> pd.DataFrame:
+        import pandas as pd
+        rows = []
+        for line in self._lines(table):
+            if line.strip():
+                rec = json.loads(line)
+                rows.append({k: rec[k] for k in columns if k in rec})
+        return pd.DataFrame(rows) if rows else pd.DataFrame(columns=columns)
+    def scan(self, table: str, *, columns: Optional[Sequence[str]] = None, filters: Optional[Sequence[Filter]] = None,
+             batch_rows: int = 100_000, schema: Optional[Schema] = None) -> Iterator[pd.DataFrame]:
+        import pandas as pd
+        need = _needed(columns, filters)
+        rows: List[dict] = []
+        for line in self._lines(table, filters):
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            rows.append(rec if need is None else {k: rec[k] for k in need if k in rec})
+            if len(rows) >= batch_rows:
+                df = _select(pd.DataFrame(rows), columns, filters, schema); rows = []
+                if len(df): yield pandas_cast(df, schema) if schema else df
+        if rows:
+            df = _select(pd.DataFrame(rows), columns, filters, schema)
+            if len(df): yield pandas_cast(df, schema) if schema else df
 
 class CSVStore:
-    def __init__(self, base: Path):
+    def __init__(self, base: Path, *, compression: Optional[str] = None, rotate_mb: Optional[float] = None,
+                 rotate_by: Optional[str] = None, date_column: str = "date"):
         self.base = Path(base); self.base.mkdir(parents=True, exist_ok=True)
+        self.segments = Segments(self.base, "csv", compression=compression, rotate_mb=rotate_mb,
+                                 rotate_by=rotate_by, date_column=date_column)
     def _path(self, table: str) -> Path:
         return self.base / f"{table}.csv"
-    def upsert(self, table: str, records: List[Mapping[str, Any]], keys: Optional[List[str]] = None):
+    def segmented(self, table: str) -> bool:
+        """Append-only <table>/part-*.csv[.gz|.zst] layout (chosen by options, or found on disk)."""
+        return self.segments.enabled or self.segments.exists(table)
+    def upsert(self, table: str, records: List[Mapping[str, Any]], keys: Optional[List[str]] = None,
+               schema: Optional[Schema] = None):
         if not records: return
+        if self.segmented(table):
+            # streaming: keys dedupe within the chunk; read(keys=...) resolves re-crawls
+            self.segments.append(table, _dedupe(records, keys), _encode_csv, with_columns=True)
+            return
+        import pandas as pd
         path = self._path(table)
         df = pd.DataFrame(records)
+        if schema:
+            df = pandas_cast(df, schema)
         if path.exists():
             old = pd.read_csv(path)
+            if schema:
+                old = pandas_cast(old, schema)
             merged = pd.concat([old, df], ignore_index=True)
             if keys and all(k in merged.columns for k in keys):
                 merged = merged.drop_duplicates(subset=keys, keep="last")
-            merged.to_csv(path, index=False)
+            _csv_frame(merged).to_csv(path, index=False)
         else:
-            df.to_csv(path, index=False)
+            _csv_frame(df).to_csv(path, index=False)
+    def _chunks(self, table: str, filters: Optional[Sequence[Filter]] = None, batch_rows: int = 100_000,
+                **read_csv) -> Iterator[pd.DataFrame]:
+        import io
+        import pandas as pd
+        path = self._path(table)
+        if path.exists():  # legacy single file first, as in JSONStore._lines
+            yield from pd.read_csv(path, chunksize=batch_rows, **read_csv)
+        if self.segmented(table):
+            lo, hi = _date_range(filters, self.segments.date_column)
+            for fr, data in self.segments.read(table, lo, hi):
+                yield pd.read_csv(io.BytesIO(data), header=0 if fr["header"] else None, names=fr["columns"], **read_csv)
+    def read_columns(self, table: str, columns: List[str]) -> pd.DataFrame:
+        import pandas as pd
+        wanted = set(columns)
+        parts = list(self._chunks(table, usecols=lambda c: c in wanted, dtype=str))
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+    def scan(self, table: str, *, columns: Optional[Sequence[str]] = None, filters: Optional[Sequence[Filter]] = None,
+             batch_rows: int = 100_000, schema: Optional[Schema] = None) -> Iterator[pd.DataFrame]:
+        need = _needed(columns, filters)
+        usecols = None if need is None else (lambda c: c in need)
+        # declared text columns stay text: dates filter lexically, timestamps as instants (_comparable)
+        text = {c: str for c, kind in (schema or {}).items() if kind in ("date", "timestamp", "string", "category")}
+        for chunk in self._chunks(table, filters, batch_rows, usecols=usecols, dtype=text or None):
+            df = _select(chunk, columns, filters, schema)
+            if len(df): yield pandas_cast(df, schema) if schema else df
+
+def _typed_filter(arrow_schema, f: Filter) -> Filter:
+    """Cast filter values to the column: ISO strings for typed date/timestamp
+    columns, date/datetime values for untyped (string) ones."""
+    import pyarrow as pa
+    col, op, val = f
+    if col not in arrow_schema.names:
+        return (col, op, val)
+    ft = arrow_schema.field(col).type
+    if pa.types.is_date(ft) or pa.types.is_timestamp(ft):
+        def cast(v):
+            return pa.scalar(v).cast(ft) if isinstance(v, str) else v
+    elif pa.types.is_string(ft) or pa.types.is_large_string(ft):
+        def cast(v):
+            return json_default(v) if isinstance(v, date) else v
+    else:
+        return (col, op, val)
+    return (col, op, [cast(v) for v in val] if op in ("in", "not in") else cast(val))
+
+def _drop_duplicates(tbl, keys: List[str]):
+    """Keep the last row per key, preserving row order (pyarrow has no drop_duplicates)."""
+    import pyarrow as pa, pyarrow.compute as pc
+    tagged = tbl.append_column("__row", pa.array(range(tbl.num_rows), pa.int64()))
+    last = tagged.group_by(keys, use_threads=False).aggregate([("__row", "max")])["__row_max"]
+    return tbl.take(last.take(pc.sort_indices(last)))
 
 class ParquetStore:
-    def __init__(self, base: Path):
+    def __init__(self, base: Path, *, sort_column: str = "date", row_group_rows: int = 65_536):
         if not _HAS_PARQUET:
             raise RuntimeError("pyarrow not installed. Install with 'pip install elexon-dl[parquet]'")
         self.base = Path(base); self.base.mkdir(parents=True, exist_ok=True)
+        self.sort_column = sort_column
+        self.row_group_rows = row_group_rows
     def _path(self, table: str) -> Path:
         return self.base / f"{table}.parquet"
-    def upsert(self, table: str, records: List[Mapping[str, Any]], keys: Optional[List[str]] = None):
+    def upsert(self, table: str, records: List[Mapping[str, Any]], keys: Optional[List[str]] = None,
+               schema: Optional[Schema] = None):
         if not records: return
         import pyarrow as pa, pyarrow.parquet as pq
         path = self._path(table)
         batch = pa.Table.from_pylist(list(records))
-        if path.exists() and keys:
+        if schema:
+            batch = arrow_cast(batch, schema)
+        if path.exists():
             existing = pq.read_table(path)
-            if all(k in existing.column_names and k in batch.column_names for k in keys):
-                merged = pa.concat_tables([existing, batch]).drop_duplicates(keys=keys, keep="last")
-                pq.write_table(merged, path); return
-        pq.write_table(batch, path)
+            if schema:
+                existing = arrow_cast(existing, schema)  # files written before the schema was declared
+            merged = pa.concat_tables([existing, batch], promote_options="permissive")
+            if keys and all(k in existing.column_names and k in batch.column_names for k in keys):
+                merged = _drop_duplicates(merged, keys)
+            self._write(merged, path); return
+        self._write(batch, path)
+    def _write(self, tbl, path: Path):
+        import pyarrow.parquet as pq
+        # sorted by date with modest row groups so min/max stats prune date-range reads
+        if self.sort_column in tbl.column_names:
+            tbl = tbl.sort_by(self.sort_column)
+        pq.write_table(tbl, path, row_group_size=self.row_group_rows)
+    def read_columns(self, table: str, columns: List[str]) -> pd.DataFrame:
+        import pandas as pd, pyarrow.parquet as pq
+        path = self._path(table)
+        if not path.exists():
+            return pd.DataFrame(columns=columns)
+        present = pq.read_schema(path).names
+        return pq.read_table(path, columns=[c for c in columns if c in present]).to_pandas()
+    def scan_arrow(self, table: str, *, columns: Optional[Sequence[str]] = None, filters: Optional[Sequence[Filter]] = None,
+                   batch_rows: int = 100_000) -> Iterator["pa.RecordBatch"]:
+        """Stream record batches; filters are pushed down to row-group statistics."""
+        import pyarrow.dataset as ds, pyarrow.parquet as pq
+        path = self._path(table)
+        if not path.exists():
+            return
+        dset = ds.dataset(path, format="parquet")
+        cols = None if columns is None else [c for c in columns if c in dset.schema.names]
+        expr = pq.filters_to_expression([_typed_filter(dset.schema, f) for f in filters]) if filters else None
+        for batch in dset.to_batches(columns=cols, filter=expr, batch_size=batch_rows):
+            if batch.num_rows:
+                yield batch
+    def scan(self, table: str, *, columns: Optional[Sequence[str]] = None, filters: Optional[Sequence[Filter]] = None,
+             batch_rows: int = 100_000, schema: Optional[Schema] = None) -> Iterator[pd.DataFrame]:
+        for batch in self.scan_arrow(table, columns=columns, filters=filters, batch_rows=batch_rows):
+            yield batch.to_pandas()
@@ -0,0 +1,55 @@
+from elexon_dl.cache import DiskCache
+
+KEY_A = "a" * 40
+KEY_B = "b" * 40
+
+def test_put_get_dedupes_bodies(tmp_path):
+    c = DiskCache(tmp_path)
+    c.put(KEY_A, b'{"data": []}', {"url": "u1"})
+    c.put(KEY_B, b'{"data": []}', {"url": "u2"})
+    assert c.get(KEY_A)[0] == b'{"data": []}'
+    assert c.get(KEY_B)[1]["url"] == "u2"
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 1
+
+def test_corrupt_body_is_a_miss(tmp_path):
+    c = DiskCache(tmp_path)
+    c.put(KEY_A, b"payload", {})
+    (obj,) = (tmp_path / "objects").glob("*/*")
+    obj.write_bytes(b"paylo")
+    assert c.get(KEY_A) is None
+    assert obj.read_bytes() == b"paylo"  # a failed read never deletes shared objects
+    c.put(KEY_B, b"payload", {})  # any later put of the same body repairs it
+    assert c.get(KEY_A)[0] == b"payload"
+
+def test_ttl_expiry(tmp_path):
+    DiskCache(tmp_path).put(KEY_A, b"x", {"ts": 0})
+    assert DiskCache(tmp_path, ttl_s=60).get(KEY_A) is None
+    assert DiskCache(tmp_path).get(KEY_A) is not None
+
+def test_export_import_roundtrip(tmp_path):
+    src = DiskCache(tmp_path / "src")
+    src.put(KEY_A, b"one", {"url": "u1"})
+    src.put(KEY_B, b"two", {"url": "u2"})
+    bundle = tmp_path / "cache.tar.gz"
+    assert src.export_bundle(bundle) == 2
+    dst = DiskCache(tmp_path / "dst")
+    assert dst.import_bundle(bundle) == 2
+    assert dst.get(KEY_B)[0] == b"two"
+    assert dst.import_bundle(bundle) == 0  # local entries are as new as the bundle's
+
+def test_old_flat_entries_migrate_and_stale_temps_are_swept(tmp_path):
+    import json, os
+    (tmp_path / f"{KEY_A}.bin").write_bytes(b"old-a")
+    (tmp_path / f"{KEY_A}.meta.json").write_text(json.dumps({"ts": 5, "url": "u"}))
+    (tmp_path / f"{KEY_B}.bin").write_bytes(b"old-b")
+    c = DiskCache(tmp_path)
+    data, ref = c.get(KEY_A)  # migrated on read
+    assert (data, ref["ts"], ref["url"]) == (b"old-a", 5, "u")
+    assert not (tmp_path / f"{KEY_A}.bin").exists() and not (tmp_path / f"{KEY_A}.meta.json").exists()
+
+    stale, live = tmp_path / "refs" / "aa" / ".x.json.1.dead.tmp", tmp_path / "refs" / "aa" / ".y.json.2.live.tmp"
+    stale.write_bytes(b""); live.write_bytes(b"")
+    os.utime(stale, (0, 0))
+    assert c.sweep() == (1, 1)
+    assert c.get(KEY_B)[0] == b"old-b" and not list(tmp_path.glob("*.bin"))
+    assert not stale.exists() and live.exists()
@@ -0,0 +1,28 @@
+from dataclasses import asdict
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from elexon_dl.config import Defaults, http_settings
+from elexon_dl.settings import Settings
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    import os
+    for k in list(os.environ):
+        if k.upper().startswith("ELEXON_"):
+            monkeypatch.delenv(k)
+    return monkeypatch
+
+def test_settings_fields_match_defaults(clean_env):
+    assert Settings().model_dump() == asdict(Defaults())
+
+def test_http_settings_parses_overrides_with_pydantic(clean_env):
+    assert type(http_settings()) is Defaults
+    clean_env.setenv("elexon_timeout_s", "2.5")
+    s = http_settings()
+    assert isinstance(s, Settings) and s.timeout_s == 2.5
+    clean_env.setenv("ELEXON_MAX_RETRIES", "lots")
+    with pytest.raises(ValueError):  # pydantic's ValidationError
+        http_settings()
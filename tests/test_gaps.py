@@ -0,0 +1,79 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("dateutil")
+pytest.importorskip("httpx")
+pytest.importorskip("pydantic_settings")
+
+from elexon_dl.engine import EndpointSpec, SpecCrawler, TimeStrategy
+from elexon_dl.gaps import Coverage, missing_contexts
+from elexon_dl.storage import CSVStore, JSONStore, ParquetStore, _HAS_PARQUET
+
+SETTINGS = SimpleNamespace(max_concurrency=4, base_url="https://example.test")
+
+def test_missing_contexts_dst_short_day(tmp_path):
+    spec = EndpointSpec(name="t", time=TimeStrategy(kind="date_sp"), table="t", dims={"bidOfferType": ["bid", "offer"]})
+    store = JSONStore(tmp_path)
+    rows = [
+        {"date": "2024-03-31", "settlementPeriod": sp, "bidOfferType": side, "v": 1}
+        for sp in range(1, 47) for side in ("bid", "offer")
+        if (sp, side) not in {(7, "bid"), (46, "offer")}
+    ]
+    store.upsert("t", rows)
+    missing = missing_contexts(SETTINGS, spec, store, start_date=date(2024, 3, 31), end_date=date(2024, 3, 31))
+    assert [(c["sp"], c["bidOfferType"]) for c in missing] == [(7, "bid"), (46, "offer")]
+
+def test_slot_coverage_uses_requested_slot_not_payload_publish_time(tmp_path):
+    spec = EndpointSpec(name="t", time=TimeStrategy(kind="halfhour_slots"), table="t")
+    crawler = SpecCrawler(SETTINGS, spec)
+    ctxs = list(crawler.contexts(date(2024, 12, 1), date(2024, 12, 1)))
+    store = JSONStore(tmp_path)
+    # the API answers every slot with its latest earlier publish, not the slot itself
+    store.upsert("t", [row for ctx in ctxs[:-1] for row in crawler._enrich([{"publishTime": "2024-11-30T23:00:00Z"}], ctx)])
+    missing = missing_contexts(SETTINGS, spec, store, start_date=date(2024, 12, 1), end_date=date(2024, 12, 1))
+    assert missing == ctxs[-1:]
+
+def test_missing_contexts_publish_slots_legacy_rows(tmp_path):
+    spec = EndpointSpec(name="t", time=TimeStrategy(kind="publish_slots_fixed_utc", publish_slots=["03:30", "05:30"],
+                                                    slot_column="publishTime"), table="t")
+    store = JSONStore(tmp_path)
+    store.upsert("t", [{"publishTime": "2024-12-01T03:30:00.000Z", "startTime": "x"}])
+    missing = missing_contexts(SETTINGS, spec, store, start_date=date(2024, 12, 1), end_date=date(2024, 12, 2))
+    assert [c["publishTime"] for c in missing] == ["2024-12-01T05:30:00Z", "2024-12-02T03:30:00Z", "2024-12-02T05:30:00Z"]
+
+def test_legacy_rows_use_spec_slot_column(tmp_path):
+    # wind_evolution-style: the slot is the forecast startTime, publishTime lists earlier publishes
+    spec = EndpointSpec(name="t", time=TimeStrategy(kind="halfhour_slots", slot_column="startTime"), table="t")
+    store = JSONStore(tmp_path)
+    store.upsert("t", [{"startTime": "2024-12-01T12:00:00Z", "publishTime": f"2024-12-01T{h:02d}:00:00Z"} for h in range(3, 11)])
+    missing = {c["publishTime"] for c in missing_contexts(SETTINGS, spec, store, start_date=date(2024, 12, 1), end_date=date(2024, 12, 1))}
+    assert "2024-12-01T12:00:00Z" not in missing and "2024-12-01T03:00:00Z" in missing and len(missing) == 47
+
+class _FakeHTTP:
+    """Answers every slot with the same latest earlier publish; the last slot is empty."""
+    def __init__(self, empty: str):
+        self.empty = empty
+    async def get(self, url, params=None):
+        if params["publishTime"] == self.empty:
+            return SimpleNamespace(status_code=404)
+        payload = {"data": [{"publishTime": "2024-11-30T23:00:00Z", "startTime": "2024-12-01T12:00:00Z", "v": 1}]}
+        return SimpleNamespace(status_code=200, json=lambda: payload, raise_for_status=lambda: None)
+
+@pytest.mark.parametrize("cls", [JSONStore, CSVStore] + ([ParquetStore] if _HAS_PARQUET else []))
+def test_keyed_crawl_records_coverage(tmp_path, cls):
+    spec = EndpointSpec(name="t", query_template={"publishTime": "{publishTime}"}, time=TimeStrategy(kind="halfhour_slots"),
+                        table="t", primary_keys=("publishTime", "startTime"))
+    store = cls(tmp_path)
+    crawler = SpecCrawler(SETTINGS, spec, batch_size=7, on_fetched=Coverage(tmp_path, spec).add)
+    ctxs = list(crawler.contexts(date(2024, 12, 1), date(2024, 12, 1)))
+
+    async def crawl():
+        async for chunk in crawler.pages_for(_FakeHTTP(ctxs[-1]["publishTime"]), ctxs):
+            store.upsert("t", chunk, keys=list(spec.primary_keys))
+    asyncio.run(crawl())
+    assert len(store.read_columns("t", ["publishTime"])) == 1  # 47 slots collapsed into one row
+    assert missing_contexts(SETTINGS, spec, store, start_date=date(2024, 12, 1), end_date=date(2024, 12, 1)) == []
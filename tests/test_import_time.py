@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("typer")
+pytest.importorskip("httpx")
+
+HEAVY = ("pandas", "pyarrow", "dateutil", "pydantic", "pydantic_settings",
+         "elexon_dl.storage", "elexon_dl.specs", "elexon_dl.filters")
+
+# What `elexon-dl health` imports before it sends its request.
+HEALTH_CHAIN = (
+    "import elexon_dl.cli\n"
+    "from elexon_dl.config import http_settings\n"
+    "from elexon_dl.http import AsyncHTTP\n"
+    "from elexon_dl.health import api_health\n"
+    "import asyncio\n"
+    "http_settings()\n"
+)
+# Third-party imports health needs anyway: the CLI framework and the HTTP client.
+BASELINE = "import typer, httpx, asyncio\n"
+# The guarded number: what elexon_dl's own imports add to `health` startup on top of BASELINE.
+OVERHEAD_BUDGET_MS = 100
+# Shared CI machines are noisy, so plain `make test` allows this multiple of the budget;
+# `make bench` (ELEXON_BENCH=1) holds the budget exactly.
+SLACK = 1.0 if os.environ.get("ELEXON_BENCH") else 2.0
+# default settings, as on a host with no ELEXON_* overrides
+ENV = {k: v for k, v in os.environ.items() if not k.upper().startswith("ELEXON_")}
+
+def _run(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=ENV).stdout
+
+def _best_ms(code: str, n: int = 5) -> float:
+    timed = f"import time\nt0 = time.perf_counter()\n{code}print((time.perf_counter() - t0) * 1000)\n"
+    _run(timed)  # warm bytecode caches
+    return min(float(_run(timed)) for _ in range(n))
+
+@pytest.mark.parametrize("code", ["import elexon_dl.cli\n", HEALTH_CHAIN], ids=["help", "health"])
+def test_startup_skips_heavy_modules(code):
+    loaded = _run(code + f"import sys\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))\n").strip()
+    assert loaded == ""
+
+def test_health_import_overhead_budget():
+    overhead = _best_ms(HEALTH_CHAIN) - _best_ms(BASELINE)
+    limit = OVERHEAD_BUDGET_MS * SLACK
+    assert overhead < limit, f"health imports add {overhead:.1f} ms over typer/httpx/asyncio (limit {limit:.0f} ms)"
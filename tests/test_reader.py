@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from elexon_dl import read
+from elexon_dl.storage import CSVStore, JSONStore, ParquetStore, _HAS_PARQUET
+
+ROWS = [{"date": f"2024-01-{d:02d}", "settlementPeriod": sp, "price": d * 100 + sp, "side": "bid" if sp % 2 else "offer"}
+        for d in range(1, 29) for sp in range(1, 49)]
+
+STORES = [("json", JSONStore), ("csv", CSVStore)] + ([("parquet", ParquetStore)] if _HAS_PARQUET else [])
+
+@pytest.mark.parametrize("fmt,cls", STORES)
+def test_read_date_range_and_columns(tmp_path, fmt, cls):
+    cls(tmp_path).upsert("t", ROWS)
+    df = read("t", start="2024-01-08", end="2024-01-14", columns=["date", "price"],
+              filters=[("side", "==", "bid")], output_dir=tmp_path, format=fmt)
+    assert list(df.columns) == ["date", "price"]
+    assert len(df) == 7 * 24
+    assert df["date"].min() == "2024-01-08" and df["date"].max() == "2024-01-14"
+
+@pytest.mark.skipif(not _HAS_PARQUET, reason="pyarrow not installed")
+def test_read_arrow(tmp_path):
+    ParquetStore(tmp_path).upsert("t", ROWS)
+    tbl = read("t", start="2024-01-28", output_dir=tmp_path, format="parquet", as_arrow=True)
+    assert tbl.num_rows == 48
+
+@pytest.mark.parametrize("fmt,cls", STORES)
+def test_date_filter_values_work_on_every_store(tmp_path, fmt, cls):
+    from datetime import date, datetime, timezone
+    rows = [dict(r, startTime=f"{r['date']}T00:00:00Z") for r in ROWS]
+    cls(tmp_path).upsert("t", rows)
+    df = read("t", columns=["date"], output_dir=tmp_path, format=fmt,
+              filters=[("date", ">=", date(2024, 1, 27)), ("startTime", "<", datetime(2024, 1, 28, tzinfo=timezone.utc))])
+    assert set(df["date"].astype(str)) == {"2024-01-27"}
+    df = read("t", columns=["date"], output_dir=tmp_path, format=fmt, filters=[("date", "in", [date(2024, 1, 3)])])
+    assert len(df) == 48
@@ -0,0 +1,66 @@
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("dateutil")
+
+from elexon_dl import read
+from elexon_dl.schema import coerce_rows
+from elexon_dl.storage import CSVStore, JSONStore, ParquetStore, _HAS_PARQUET
+
+SCHEMA = {"date": "date", "settlementPeriod": "int32", "startTime": "timestamp", "priceType": "category", "price": "float32"}
+
+def _rows(sp_range, price):
+    return coerce_rows([{"date": "2024-03-31", "settlementPeriod": str(sp), "startTime": f"2024-03-31T{sp % 24:02d}:00:00Z",
+                         "priceType": "Default", "price": price} for sp in sp_range], SCHEMA)
+
+def test_coerce_rows():
+    (row,) = _rows([3], "12.5")
+    assert row["date"] == date(2024, 3, 31)
+    assert row["settlementPeriod"] == 3 and row["price"] == 12.5
+    assert row["startTime"] == datetime(2024, 3, 31, 3, tzinfo=timezone.utc)
+
+STORES = [("json", JSONStore), ("csv", CSVStore)] + ([("parquet", ParquetStore)] if _HAS_PARQUET else [])
+
+@pytest.mark.parametrize("fmt,cls", STORES)
+def test_typed_upsert_roundtrip(tmp_path, fmt, cls):
+    store = cls(tmp_path)
+    store.upsert("t", _rows(range(1, 11), 1), keys=["date", "settlementPeriod"], schema=SCHEMA)
+    store.upsert("t", _rows(range(6, 16), 2), keys=["date", "settlementPeriod"], schema=SCHEMA)
+    df = read("t", start="2024-03-31", end="2024-03-31", output_dir=tmp_path, format=fmt, schema=SCHEMA)
+    assert len(df) == 15
+    assert sorted(df["settlementPeriod"].tolist()) == list(range(1, 16))
+    assert df.set_index("settlementPeriod")["price"].to_dict()[8] == 2
+    assert str(df["startTime"].dtype).endswith("UTC]")
+    assert str(df["priceType"].dtype) == "category"
+
+@pytest.mark.skipif(not _HAS_PARQUET, reason="pyarrow not installed")
+def test_typed_upsert_into_pre_schema_parquet(tmp_path):
+    store = ParquetStore(tmp_path)
+    raw = [{"date": "2024-03-31", "settlementPeriod": sp, "startTime": "2024-03-31T00:00:00Z",
+            "priceType": "Default", "price": 1.0} for sp in range(1, 6)]
+    store.upsert("t", raw, keys=["date", "settlementPeriod"])
+    store.upsert("t", _rows(range(4, 8), 2), keys=["date", "settlementPeriod"], schema=SCHEMA)
+    df = read("t", output_dir=tmp_path, format="parquet", schema=SCHEMA)
+    assert sorted(df["settlementPeriod"].tolist()) == list(range(1, 8))
+
+def test_jsonl_merge_writes_null_for_missing_timestamps(tmp_path):
+    store = JSONStore(tmp_path)
+    rows = coerce_rows([{"date": "2024-03-31", "settlementPeriod": 1, "price": 1}], SCHEMA)
+    store.upsert("t", rows, keys=["date", "settlementPeriod"], schema=SCHEMA)
+    store.upsert("t", _rows([2], 1) + rows, keys=["date", "settlementPeriod"], schema=SCHEMA)
+    text = (tmp_path / "t.jsonl").read_text()
+    assert "NaT" not in text and "NaN" not in text
+    assert [json.loads(line).get("startTime") for line in text.splitlines()] == ["2024-03-31T02:00:00Z", None]
+
+@pytest.mark.parametrize("fmt,cls", STORES)
+def test_string_timestamp_filter_boundary(tmp_path, fmt, cls):
+    store = cls(tmp_path)
+    store.upsert("t", _rows(range(1, 11), 1), schema=SCHEMA)
+    store.upsert("t", _rows(range(11, 16), 1), keys=["date", "settlementPeriod"], schema=SCHEMA)  # merged rewrite
+    df = read("t", output_dir=tmp_path, format=fmt, schema=SCHEMA, filters=[("startTime", ">=", "2024-03-31T05:00:00Z")])
+    assert sorted(df["settlementPeriod"].tolist()) == list(range(5, 16))
+    if fmt == "csv":
+        assert ",2024-03-31T05:00:00Z," in (tmp_path / "t.csv").read_text()  # same text as JSONL
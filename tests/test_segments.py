@@ -0,0 +1,66 @@
+import gzip
+import json
+from importlib.util import find_spec
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from elexon_dl import read
+from elexon_dl.storage import CSVStore, JSONStore
+
+CODECS = ["gzip", None] + (["zstd"] if find_spec("zstandard") else [])
+
+def _day(d, v=1):
+    return [{"date": f"2024-01-{d:02d}", "settlementPeriod": sp, "v": v} for sp in range(1, 49)]
+
+@pytest.mark.parametrize("cls,fmt", [(JSONStore, "json"), (CSVStore, "csv")])
+@pytest.mark.parametrize("codec", CODECS)
+def test_segmented_roundtrip_rotation_and_pruning(tmp_path, cls, fmt, codec):
+    store = cls(tmp_path, compression=codec, rotate_mb=0.001)
+    for d in range(1, 11):
+        store.upsert("t", _day(d))
+    store.upsert("t", _day(3, v=2), keys=["date", "settlementPeriod"])  # re-crawl is appended
+    assert len(list((tmp_path / "t").glob("part-*"))) > 1
+    frames = [json.loads(line) for line in (tmp_path / "t" / "_index.jsonl").read_text().splitlines()]
+    assert len(frames) == 11 and frames[0]["min"] == "2024-01-01"
+
+    df = read("t", start="2024-01-03", end="2024-01-04", output_dir=tmp_path, format=fmt,
+              keys=["date", "settlementPeriod"])
+    assert len(df) == 96
+    assert set(df.loc[df["date"] == "2024-01-03", "v"]) == {2}
+
+def test_rotate_by_month_gzip_parts_are_plain_gzip(tmp_path):
+    store = CSVStore(tmp_path, compression="gzip", rotate_by="month")
+    store.upsert("t", _day(30) + [{"date": "2024-02-01", "settlementPeriod": 1, "v": 1}])
+    store.upsert("t", _day(31))
+    (part,) = (tmp_path / "t" / "date=2024-01").glob("part-*.csv.gz")
+    lines = gzip.decompress(part.read_bytes()).decode().splitlines()
+    assert lines[0] == "date,settlementPeriod,v" and len(lines) == 1 + 96
+    assert (tmp_path / "t" / "date=2024-02" / "part-00000.csv.gz").exists()
+
+@pytest.mark.parametrize("cls,fmt", [(JSONStore, "json"), (CSVStore, "csv")])
+def test_legacy_file_still_read_after_segmenting(tmp_path, cls, fmt):
+    cls(tmp_path).upsert("t", _day(1))  # plain <table>.jsonl / .csv from an earlier crawl
+    store = cls(tmp_path, compression="gzip")
+    store.upsert("t", _day(1, v=2)[:1] + _day(2))
+    assert len(read("t", output_dir=tmp_path, format=fmt)) == 48 + 49
+    df = read("t", output_dir=tmp_path, format=fmt, keys=["date", "settlementPeriod"])
+    assert len(df) == 96 and df.loc[df["settlementPeriod"] == 1, "v"].tolist() == [2, 1]
+    # a later plain-options store sees the segments on disk and still reads both layouts
+    assert len(cls(tmp_path).read_columns("t", ["date"]).drop_duplicates()) == 2
+
+def test_segmented_reads_default_to_spec_primary_keys(tmp_path):
+    from elexon_dl import iter_read
+
+    def day(v):  # system_prices rows, keyed on (settlementDate, settlementPeriod, priceType)
+        return [{"date": "2024-01-01", "settlementDate": "2024-01-01", "settlementPeriod": sp, "priceType": "Default",
+                 "systemSellPrice": v} for sp in range(1, 49)]
+    store = JSONStore(tmp_path, compression="gzip")
+    store.upsert("system_prices", day(1))
+    store.upsert("system_prices", day(2))  # re-crawl is appended
+    df = read("system_prices", output_dir=tmp_path, columns=["settlementPeriod", "systemSellPrice"])
+    assert len(df) == 48 and set(df["systemSellPrice"]) == {2} and list(df.columns) == ["settlementPeriod", "systemSellPrice"]
+    assert len(read("system_prices", output_dir=tmp_path, keys=())) == 96
+    assert sum(len(b) for b in iter_read("system_prices", output_dir=tmp_path)) == 48  # one batch
+    assert sum(len(b) for b in iter_read("system_prices", output_dir=tmp_path, batch_rows=48)) == 96  # per batch only